@@ -5,6 +5,7 @@ Premium Telegram bot for Render Web Service with JSON file storage:
 - Flask keep-alive routes (/) and (/ping-test)
 - Uses JSON file storage for persistence across restarts
 - Features: join-check, referral, balance, bonus, stock withdraw, admin broadcast
+- Streaming bulk export (users/stock) and chunked stock import as documents
 - Premium support and buy interfaces
 """
 
@@ -13,6 +14,11 @@ import time
 import threading
 import traceback
 import json
+import csv
+import gzip
+import io
+import itertools
+import tempfile
 from collections import defaultdict
 
 # Import with error handling
@@ -20,6 +26,7 @@ try:
     import telebot
     from telebot import types
     from flask import Flask, request
+    import requests
 except ImportError as e:
     print(f"Import error: {e}")
     print("Please make sure all required packages are installed")
@@ -46,6 +53,11 @@ CHANNELS = [
 ]
 CHANNEL_ID_FOR_REF = -1002964116333
 SEND_DELAY = float(os.getenv("SEND_DELAY", "0.1"))  # Increased delay for safety
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))  # Stock items saved per commit
+MESSAGE_LIMIT = 4096  # Telegram max message length (UTF-16 code units)
+STOCKLIST_MAX_PAGES = 5  # Longer listings point to /exportstock instead
+IMPORT_FORMATS = (".txt", ".csv", ".jsonl")  # Each may also be gzipped (.gz)
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024  # Bot API refuses to serve larger files
 
 # ---------------- Bot & Flask ----------------
 bot = telebot.TeleBot(BOT_TOKEN)
@@ -65,15 +77,17 @@ def load_data():
     return {"users": {}, "stock": []}
 
 def save_data():
-    """Save data to JSON file"""
+    """Save data to JSON file, returns True on success"""
     try:
         with open(DATA_FILE, 'w') as f:
             json.dump({
                 "users": users_dict,
                 "stock": stock_list
             }, f)
+        return True
     except Exception as e:
         print(f"Error saving data: {e}")
+        return False
 
 # Load initial data
 data = load_data()
@@ -273,10 +287,237 @@ def stock_list_cmd(message):
         bot.reply_to(message, "📦 Stock is empty.")
         return
     
-    text = "📦 Current Stock Items:\n\n"
-    for i, reward in enumerate(stock_list, 1):
-        text += f"ID: {i} | Reward: {reward}\n"
-    bot.reply_to(message, text)
+    # Send a few message-sized pages instead of one oversized string
+    items = list(stock_list)
+    shown = 0
+    pages = iter_stock_messages("📦 Current Stock Items:\n\n", items)
+    for n, (text, shown) in enumerate(itertools.islice(pages, STOCKLIST_MAX_PAGES)):
+        if n == 0:
+            bot.reply_to(message, text)
+        else:
+            time.sleep(1)  # Stay under Telegram's per-chat rate limit
+            bot.send_message(message.chat.id, text)
+    if shown < len(items):
+        time.sleep(1)
+        bot.send_message(
+            message.chat.id,
+            f"➕ {len(items) - shown} more item(s). Use /exportstock for the full list."
+        )
+
+def tg_len(text):
+    """Length of text as Telegram counts it (UTF-16 code units)"""
+    return len(text.encode("utf-16-le")) // 2
+
+def truncate_message(text, limit=MESSAGE_LIMIT):
+    """Cut text to fit in `limit` UTF-16 code units, marking the cut with …"""
+    if tg_len(text) <= limit:
+        return text
+    # errors="ignore" drops a surrogate pair split by the cut
+    return text.encode("utf-16-le")[:2 * (limit - 1)].decode("utf-16-le", errors="ignore") + "…"
+
+def iter_stock_messages(header, items):
+    """Yield (text, items shown so far) pages that each fit in one message"""
+    text = header
+    size = tg_len(text)
+    # Leave room for the header so even the first line fits on page one
+    line_limit = MESSAGE_LIMIT - size
+    for i, reward in enumerate(items, 1):
+        # Truncate before the newline so a cut line never runs into the next one
+        line = truncate_message(f"ID: {i} | Reward: {reward}", line_limit - 1) + "\n"
+        line_size = tg_len(line)
+        if size + line_size > MESSAGE_LIMIT:
+            yield text, i - 1
+            text, size = "", 0
+        text += line
+        size += line_size
+    if text:
+        yield text, len(items)
+
+# ========== Bulk Export / Import ==========
+USER_EXPORT_FIELDS = ["user_id", "username", "balance", "referred_by", "last_bonus"]
+
+def iter_user_csv_lines():
+    """Yield one CSV line per user, without building the whole export"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for uid in list(users_dict.keys()):
+        u = users_dict.get(uid)
+        if u is None:  # Deleted while exporting
+            continue
+        writer.writerow([
+            uid,
+            u.get("username", ""),
+            u.get("balance", 0),
+            u.get("referred_by") or "",
+            u.get("last_bonus", 0)
+        ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+
+def iter_stock_jsonl_lines():
+    """Yield one JSON line per stock item"""
+    # Snapshot references so concurrent withdrawals/imports don't shift rows
+    for i, reward in enumerate(list(stock_list), 1):
+        yield json.dumps({"id": i, "reward": reward}, ensure_ascii=False) + "\n"
+
+def send_export(chat_id, filename, lines, header=None):
+    """Stream lines into a gzip temp file and send it as a document"""
+    count = 0
+    with tempfile.TemporaryFile() as tmp:
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=tmp, mode="wb"), encoding="utf-8", newline="") as out:
+            if header:
+                out.write(header)
+            for line in lines:
+                out.write(line)
+                count += 1
+        tmp.seek(0)
+        bot.send_document(
+            chat_id, tmp,
+            caption=f"📤 Export complete: {count} row(s)",
+            visible_file_name=filename
+        )
+    return count
+
+def iter_chunks(items, size):
+    """Yield lists of up to `size` items from any iterable"""
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_import_rewards(lines, filename):
+    """Yield stock rewards from a .jsonl, .csv or .txt file"""
+    if filename.endswith(".jsonl"):
+        for n, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            reward = item.get("reward") if isinstance(item, dict) else item
+            if not isinstance(reward, str) or not reward.strip():
+                raise ValueError(f"line {n} has no reward text")
+            yield reward
+    elif filename.endswith(".csv"):
+        first = True
+        for row in csv.reader(lines):
+            # Reward is the last column; skip an optional header row
+            if not row or not row[-1].strip():
+                continue
+            if first and row[-1].strip().lower() == "reward":
+                first = False
+                continue
+            first = False
+            yield row[-1]
+    elif filename.endswith(".txt"):
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+    else:
+        raise ValueError(f"unsupported file type: {filename}")
+
+@bot.message_handler(commands=['exportusers'])
+def export_users(message):
+    if not is_owner(message.from_user.id):
+        bot.reply_to(message, "❌ Only owner can use this command!")
+        return
+    try:
+        send_export(message.chat.id, "users.csv.gz", iter_user_csv_lines(),
+                    header=",".join(USER_EXPORT_FIELDS) + "\r\n")
+    except Exception as e:
+        # Network errors carry the bot token in their URL, so never echo them
+        print(f"User export failed: {type(e).__name__}")
+        bot.reply_to(message, "❌ Export failed. Please try again later.")
+
+@bot.message_handler(commands=['exportstock'])
+def export_stock(message):
+    if not is_owner(message.from_user.id):
+        bot.reply_to(message, "❌ Only owner can use this command!")
+        return
+    if not stock_list:
+        bot.reply_to(message, "📦 Stock is empty.")
+        return
+    try:
+        send_export(message.chat.id, "stock.jsonl.gz", iter_stock_jsonl_lines())
+    except Exception as e:
+        # Network errors carry the bot token in their URL, so never echo them
+        print(f"Stock export failed: {type(e).__name__}")
+        bot.reply_to(message, "❌ Export failed. Please try again later.")
+
+@bot.message_handler(commands=['importstock'])
+def import_stock_cmd(message):
+    if not is_admin(message.from_user.id):
+        bot.reply_to(message, "❌ Only admins can use this command!")
+        return
+    m = bot.reply_to(
+        message,
+        "📥 Send the stock file as a document:\n"
+        "• .txt — one reward per line\n"
+        "• .csv — reward in the last column\n"
+        "• .jsonl — {\"reward\": ...} per line (as from /exportstock)\n"
+        "Gzipped files (.gz) are accepted too."
+    )
+    bot.register_next_step_handler(m, process_import_stock)
+
+def process_import_stock(message):
+    if not is_admin(message.from_user.id):
+        return
+    if message.content_type != "document":
+        bot.reply_to(message, "❌ No document received. Import cancelled.")
+        return
+
+    filename = (message.document.file_name or "").lower()
+    compressed = filename.endswith(".gz")
+    if compressed:
+        filename = filename[:-3]
+    if not filename.endswith(IMPORT_FORMATS):
+        bot.reply_to(message, "❌ Unsupported file. Send a .txt, .csv or .jsonl file (optionally .gz).")
+        return
+    if (message.document.file_size or 0) > MAX_DOWNLOAD_SIZE:
+        bot.reply_to(message, "❌ File too large (max 20 MB). Split it into smaller files or gzip it (.gz).")
+        return
+
+    added = 0
+    try:
+        url = bot.get_file_url(message.document.file_id)
+        with requests.get(url, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            stream = gzip.GzipFile(fileobj=resp.raw) if compressed else resp.raw
+            # csv needs newline="" to keep newlines inside quoted fields
+            lines = io.TextIOWrapper(stream, encoding="utf-8-sig",
+                                     newline="" if filename.endswith(".csv") else None)
+            # One save per chunk keeps memory and disk writes bounded
+            for chunk in iter_chunks(iter_import_rewards(lines, filename), IMPORT_CHUNK_SIZE):
+                start = len(stock_list)
+                stock_list.extend(chunk)
+                if not save_data():
+                    # Drop the unsaved chunk so a later save can't persist it
+                    del stock_list[start:]
+                    bot.reply_to(
+                        message,
+                        f"❌ Saving stock failed after {added} item(s). Import stopped; "
+                        "the failed chunk was discarded."
+                    )
+                    return
+                added += len(chunk)
+    except requests.RequestException as e:
+        # The file URL contains the bot token, so never echo the error
+        print(f"Stock import download failed: {type(e).__name__}")
+        bot.reply_to(message, f"❌ Download failed after {added} item(s). Please try again.")
+        return
+    except (ValueError, csv.Error, EOFError, gzip.BadGzipFile) as e:
+        print(f"Stock import failed: {e}")
+        bot.reply_to(message, f"❌ Import stopped after {added} item(s): {e}")
+        return
+    except Exception as e:
+        print(f"Stock import failed: {type(e).__name__}")
+        bot.reply_to(message, f"❌ Import stopped after {added} item(s).")
+        return
+    bot.reply_to(message, f"✅ Imported {added} item(s). Stock count: {len(stock_list)}")
 
 # ========== Owner: Admin Management ==========
 @bot.message_handler(commands=['addadmin'])